@@ -0,0 +1,37 @@
+"""Lesezugriff auf die Historie der Kursdaten in der SQLite Datenbank "History.db".
+
+Die Datenbank wird in CryptoKursGesamt.ipynb geschrieben, die Funktionen werden dort sowie im Notebook zur
+Visualisierung (Visualization.ipynb) verwendet.
+"""
+import sqlite3
+
+import pandas as pd
+
+
+# Einlesen der gesamten Historie im Langformat, Währung und ValueCategory als Kategorien
+def read_history_long(path="History.db"):
+    con = sqlite3.connect(path)
+    long = pd.read_sql_query("SELECT timestamp, currency, ValueCategory, value FROM history ORDER BY rowid", con)
+    con.close()
+    long["timestamp"] = pd.to_datetime(long["timestamp"])
+    for column in ["currency", "ValueCategory"]:
+        long[column] = pd.Categorical(long[column], categories=long[column].unique())
+    return long
+
+
+# Einlesen der gesamten Historie im Format der bisherigen HistoryDF.csv
+def read_history(path="History.db"):
+    long = read_history_long(path)
+    HistoryDF = long.pivot_table(index=["timestamp", "ValueCategory"], columns="currency", values="value", aggfunc="first", sort=False, observed=True).reset_index()
+    return HistoryDF[list(long["currency"].cat.categories) + ["ValueCategory", "timestamp"]].rename_axis(columns=None)
+
+
+# Einlesen des Registers, je Zeile ein Zeitraum, in dem eine Währung in den Top-N war
+def read_registry(path="History.db"):
+    con = sqlite3.connect(path)
+    registry = pd.read_sql_query("SELECT c.id, c.short, c.name, m.entered, m.exited FROM currencies c "
+                                 "JOIN membership m ON m.currency_id = c.id ORDER BY m.entered, c.id", con)
+    con.close()
+    registry["entered"] = pd.to_datetime(registry["entered"])
+    registry["exited"] = pd.to_datetime(registry["exited"])
+    return registry
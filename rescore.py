@@ -0,0 +1,11 @@
+"""Neubewertung des Tweet-Archivs ohne Abzug neuer Daten (s. Kapitel 6 in CryptoKursGesamt.ipynb).
+
+Aufruf: python rescore.py [start_day] [end_day]
+"""
+import sys
+
+from tweet_sentiment import rescore_archive
+
+if __name__ == "__main__":
+    RescoredRows, RescoreStats = rescore_archive(*sys.argv[1:3])
+    print(RescoreStats)
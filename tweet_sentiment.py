@@ -0,0 +1,406 @@
+"""Normalisierung, Bewertung und Archiv der Tweets (s. Kapitel 3.2 und 6 in CryptoKursGesamt.ipynb).
+
+Das Modul enthält die Bewertung der Tweets über TextBlob (mit Prozess-Pool und Cache) bzw. das vektorisierte Lexikon,
+das Archiv der abgerufenen Tweets sowie deren Neubewertung. Es wird vom Notebook CryptoKursGesamt.ipynb und vom Skript
+rescore.py verwendet. Beim Import werden keine Dateien geöffnet oder verändert, der Cache wird erst bei der ersten
+Bewertung über cached_polarities geöffnet.
+"""
+import hashlib
+import multiprocessing
+import os
+import re
+import resource
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version as package_version
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from dateutil.tz import tzlocal
+from textblob import TextBlob
+from textblob.en import sentiment as pattern_sentiment
+
+# Spalten der abgerufenen Tweets und Schema der TwitterDF.csv (Anzahl der Tweets je Zeitpunkt und Kryptowährung)
+TWEET_COLUMNS = ["id", "created_at", "text", "crypto"]
+TWITTER_COLUMNS = ["time", "crypto", "pos", "neg", "neu", "count"]
+
+
+# Bewertung über TextBlob, verteilt auf einen Pool aus SENTIMENT_WORKERS Prozessen
+SENTIMENT_WORKERS = os.cpu_count()
+SENTIMENT_CHUNKSIZE = 1000
+SentimentPool = None
+
+
+# lädt das Lexikon des Analyzers einmalig je Prozess
+def init_sentiment_worker():
+    pattern_sentiment("")
+
+
+def polarity_batch(texts):
+    return [pattern_sentiment(text)[0] for text in texts]
+
+
+def get_sentiment_pool():
+    global SentimentPool
+    if SentimentPool is None:
+        SentimentPool = ProcessPoolExecutor(max_workers=SENTIMENT_WORKERS, initializer=init_sentiment_worker,
+                                            mp_context=multiprocessing.get_context("fork"))
+        # die Prozesse werden erst mit der ersten Aufgabe gestartet, daher wird hier eine leere Aufgabe übergeben
+        SentimentPool.submit(polarity_batch, []).result()
+    return SentimentPool
+
+
+def sentiment_polarities(tweets, chunksize=SENTIMENT_CHUNKSIZE):
+    texts = list(tweets)
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    if len(chunks) <= 1 or SENTIMENT_WORKERS <= 1:
+        results = map(polarity_batch, chunks)
+    else:
+        results = get_sentiment_pool().map(polarity_batch, chunks)
+    return np.fromiter(chain.from_iterable(results), dtype=float, count=len(texts))
+
+
+# Vergleich mit der Bewertung je Tweet über ein eigenes TextBlob Objekt, diese wird nur bis baseline_max Tweets gemessen
+def benchmark_sentiment(tweets, sizes=(1_000, 10_000, 100_000, 1_000_000), baseline_max=100_000):
+    tweets = pd.Series(tweets, dtype=object)
+    results = {}
+    for n in sizes:
+        sample = tweets.sample(n, replace=True, random_state=0, ignore_index=True) if len(tweets) else tweets
+        t = time.perf_counter()
+        sentiment_polarities(sample)
+        seconds = time.perf_counter() - t
+        baseline = np.nan
+        if len(sample) <= baseline_max:
+            t = time.perf_counter()
+            [TextBlob(tweet).sentiment.polarity for tweet in sample]
+            baseline = time.perf_counter() - t
+        results[n] = {"tweets": len(sample), "seconds": seconds, "tweets_per_second": len(sample) / seconds if seconds else np.nan,
+                      "seconds_textblob": baseline, "speedup": baseline / seconds if seconds else np.nan}
+    return pd.DataFrame(results).T
+
+
+# Normalisierung der Tweets: URLs, Mentions und Emojis (inkl. Unicode-Leerzeichen), die Muster sind für pyarrow (RE2) und Pythons re gültig
+TWEET_NOISE = r"(?:https?://|www\.)\S+|\B@\w+|[" + "\U0001F000-\U0001FAFF\u2600-\u27BF\uFE0F\u200B-\u200D\u00A0\u2000-\u200A\u202F\u205F\u3000" + "]"
+# Folgen von Leerzeichen sowie Zeilenumbrüche und Tabs, einzelne Leerzeichen bleiben unverändert
+TWEET_WHITESPACE = r"\s\s+|[^\S ]"
+# Cashtags mit mindestens einem Kleinbuchstaben ("$btc", "$Eth")
+TWEET_LOWER_CASHTAG = r"\B\$[A-Za-z0-9]*[a-z]"
+TWEET_CASHTAG = re.compile(r"\B\$[A-Za-z][A-Za-z0-9]{0,11}\b")
+TWEET_DTYPE = "string[pyarrow]"
+
+
+def normalize_tweets(tweets, dtype=TWEET_DTYPE):
+    # fehlende Texte (bspw. im Archiv) werden als leerer Tweet bewertet
+    texts = pd.Series(tweets, dtype=object).astype(dtype).fillna("")
+    texts = texts.str.replace(TWEET_NOISE, " ", regex=True)
+    # nur die Tweets mit kleingeschriebenen Cashtags werden in Python bearbeitet
+    lower = texts.str.contains(TWEET_LOWER_CASHTAG, regex=True).to_numpy(bool)
+    if lower.any():
+        texts[lower] = texts[lower].astype(object).str.replace(TWEET_CASHTAG, lambda m: m.group().upper(), regex=True)
+    texts = texts.str.replace(TWEET_WHITESPACE, " ", regex=True).str.strip()
+    return texts.astype(object)
+
+
+# Laufzeit der Normalisierung für n zufällig gezogene Tweets, je Datentyp der Spalte
+def benchmark_normalization(tweets, n=1_000_000, dtypes=(TWEET_DTYPE, "object")):
+    tweets = pd.Series(tweets, dtype=object)
+    sample = tweets.sample(n, replace=True, random_state=0, ignore_index=True) if len(tweets) else tweets
+    results = {}
+    for dtype in dtypes:
+        t = time.perf_counter()
+        normalized = normalize_tweets(sample, dtype)
+        seconds = time.perf_counter() - t
+        results[dtype] = {"tweets": len(sample), "seconds": seconds,
+                          "tweets_per_second": len(sample) / seconds if seconds else np.nan,
+                          "unique_raw": sample.nunique(), "unique_normalized": normalized.nunique()}
+    return pd.DataFrame(results).T
+
+
+# Version der gespeicherten Werte, bei Änderungen an der Bewertung POLARITY_REVISION erhöhen
+POLARITY_REVISION = 1
+POLARITY_CACHE_VERSION = f"textblob-{package_version('textblob')}/{POLARITY_REVISION}"
+
+
+def polarity_key(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+# persistenter Cache der Polarity Werte mit LRU Verdrängung
+class PolarityCache:
+    def __init__(self, path="PolarityCache.db", max_entries=500000, version=POLARITY_CACHE_VERSION):
+        self.max_entries = max_entries
+        self.con = sqlite3.connect(path)
+        self.con.execute("CREATE TABLE IF NOT EXISTS polarity (key BLOB PRIMARY KEY, polarity REAL, last_used INTEGER)")
+        self.con.execute("CREATE INDEX IF NOT EXISTS polarity_last_used ON polarity (last_used)")
+        self.con.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        # Werte einer anderen Version der Bewertung werden verworfen
+        stored = self.con.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        if stored is None or stored[0] != version:
+            with self.con:
+                self.con.execute("DELETE FROM polarity")
+                self.con.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+        # Anzahl der Einträge wird einmalig beim Öffnen gezählt und danach im Speicher mitgeführt
+        self.entries = self.con.execute("SELECT COUNT(*) FROM polarity").fetchone()[0]
+
+    # liefert die bekannten Polarity Werte und markiert diese als verwendet
+    def get(self, keys, batch=500):
+        keys = list(keys)
+        found = {}
+        for i in range(0, len(keys), batch):
+            chunk = keys[i:i + batch]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(self.con.execute(f"SELECT key, polarity FROM polarity WHERE key IN ({placeholders})", chunk))
+        with self.con:
+            self.con.executemany("UPDATE polarity SET last_used = ? WHERE key = ?", [(time.time_ns(), key) for key in found])
+        return found
+
+    def put(self, values):
+        now = time.time_ns()
+        with self.con:
+            # bereits vorhandene Schlüssel werden nicht erneut gezählt
+            self.entries += self.con.executemany("INSERT OR IGNORE INTO polarity VALUES (?, ?, ?)",
+                                                 [(key, polarity, now) for key, polarity in values.items()]).rowcount
+            excess = self.entries - self.max_entries
+            # verdrängt wird nur, wenn die neuen Einträge den Cache über max_entries hinaus füllen
+            if excess > 0:
+                self.entries -= self.con.execute("DELETE FROM polarity WHERE rowid IN (SELECT rowid FROM polarity ORDER BY last_used LIMIT ?)", (excess,)).rowcount
+
+
+# Cache der Pipeline, wird wie der Prozess-Pool erst beim ersten Aufruf geöffnet
+polarity_cache = None
+PolarityCacheStats = {}
+
+
+def get_polarity_cache():
+    global polarity_cache
+    if polarity_cache is None:
+        polarity_cache = PolarityCache()
+    return polarity_cache
+
+
+def cached_polarities(tweets, cache=None):
+    cache = cache or get_polarity_cache()
+    texts = list(tweets)
+    keys = [polarity_key(text) for text in texts]
+    known = cache.get(set(keys))
+    # jeder unbekannte Text wird nur einmal bewertet
+    missing = {key: text for key, text in zip(keys, texts) if key not in known}
+    scored = dict(zip(missing, sentiment_polarities(missing.values())))
+    cache.put(scored)
+    known.update(scored)
+    hits = sum(key not in scored for key in keys)
+    # die Werte werden über alle Aufrufe eines Durchlaufs aufsummiert
+    for name, value in {'tweets': len(texts), 'hits': hits, 'scored': len(scored)}.items():
+        PolarityCacheStats[name] = PolarityCacheStats.get(name, 0) + value
+    PolarityCacheStats['hit_rate'] = PolarityCacheStats['hits'] / PolarityCacheStats['tweets'] if PolarityCacheStats['tweets'] else 0.0
+    return np.array([known[key] for key in keys], dtype=float)
+
+
+# Lexikon des PatternAnalyzers als Index und Arrays
+pattern_sentiment.load()
+LEXICON_WORDS = [word for word, tags in dict.items(pattern_sentiment) if None in tags]
+LEXICON_INDEX = {word: i for i, word in enumerate(LEXICON_WORDS)}
+LEXICON_POLARITY = np.array([pattern_sentiment[word][None][0] for word in LEXICON_WORDS])
+LEXICON_INTENSITY = np.array([pattern_sentiment[word][None][2] for word in LEXICON_WORDS])
+LEXICON_MODIFIER = np.array([any(tag in pattern_sentiment[word] for tag in pattern_sentiment.modifiers) for word in LEXICON_WORDS])
+LEXICON_NEGATIONS = list(pattern_sentiment.negations)
+LEXICON_TOKEN = r"[a-z0-9]+(?:-[a-z0-9]+)*|!"
+
+
+def lexicon_polarities(tweets):
+    texts = pd.Series(list(tweets), dtype=object)
+    # Schritt 1: Zerlegung aller Tweets in eine gemeinsame Liste von Wörtern, je Wort die Nummer des Tweets
+    tokens = texts.str.lower().str.findall(LEXICON_TOKEN).explode().dropna()
+    word_tweet = tokens.index.to_numpy()
+    words = pd.Series(tokens.to_numpy())
+    word_position = np.arange(len(words))
+    # Position des ersten Wortes des jeweiligen Tweets, Rückbezüge dürfen nicht in den vorherigen Tweet reichen
+    tweet_start = np.searchsorted(word_tweet, word_tweet)
+
+    # Schritt 2: Spalte im Lexikon je Wort (-1 = unbekannt) und Negationen ("not", "never", "no")
+    lexicon_column = words.map(LEXICON_INDEX).fillna(-1).to_numpy(np.int64)
+    in_lexicon = lexicon_column >= 0
+    if not in_lexicon.any():
+        return np.zeros(len(texts))
+    is_negation = words.isin(LEXICON_NEGATIONS).to_numpy() & ~in_lexicon
+    # unbekannte Wörter beenden einen Modifier (mehr als 2 Zeichen) bzw. eine Negation (mehr als 1 Zeichen),
+    # gezählt wird kumulativ, sodass "keine Unterbrechung zwischen a und b" einem gleichen Zählerstand entspricht
+    word_length = words.str.len().to_numpy()
+    modifier_breaks = np.cumsum(~in_lexicon & ~is_negation & (word_length > 2))
+    negation_breaks = np.cumsum(~in_lexicon & ~is_negation & (word_length > 1))
+    # Position des letzten Lexikon-Wortes bis einschließlich bzw. vor dem jeweiligen Wort (-1 = keines)
+    last_lexicon = np.maximum.accumulate(np.where(in_lexicon, word_position, -1))
+    previous_lexicon = np.r_[-1, last_lexicon[:-1]]
+    previous_lexicon_index = np.maximum(previous_lexicon, 0)
+    # Negation direkt nach einem Modifier ("really not good") gehört zur Bewertung des Modifiers
+    negation_after_modifier = (is_negation & (previous_lexicon >= tweet_start)
+                               & LEXICON_MODIFIER[np.maximum(lexicon_column[previous_lexicon_index], 0)]
+                               & (modifier_breaks[np.maximum(word_position - 1, 0)] == modifier_breaks[previous_lexicon_index]))
+
+    # ab hier nur noch die Lexikon-Wörter: Position, Tweet und Spalte im Lexikon sowie Position des vorherigen Lexikon-Wortes
+    lex_position = word_position[in_lexicon]
+    lex_tweet = word_tweet[in_lexicon]
+    lex_column = lexicon_column[in_lexicon]
+    lex_previous = np.r_[-1, lex_position[:-1]]
+    lex_before = np.maximum(lex_position - 1, 0)
+
+    # Schritt 3 (Modifier): ein Lexikon-Wort direkt nach einem Modifier desselben Tweets ("very good") wird mit diesem
+    # zu einer Bewertung zusammengefasst, je Bewertung eine Gruppe
+    follows_modifier = (np.r_[False, lex_tweet[1:] == lex_tweet[:-1]] & LEXICON_MODIFIER[np.r_[0, lex_column[:-1]]]
+                        & (modifier_breaks[lex_before] == modifier_breaks[np.maximum(lex_previous, 0)]))
+    group = np.cumsum(~follows_modifier) - 1
+    groups = group[-1] + 1
+    # das letzte Wort einer Gruppe liefert die Polarity der Bewertung
+    group_last = np.r_[~follows_modifier[1:], True]
+
+    # Schritt 4 (Negation): letzte Negation zwischen dem vorherigen und diesem Lexikon-Wort, sofern kein längeres
+    # unbekanntes Wort dazwischen liegt
+    last_negation = np.maximum.accumulate(np.where(is_negation & ~negation_after_modifier, word_position, -1))[lex_before]
+    negated = ((last_negation >= np.maximum(lex_previous + 1, tweet_start[in_lexicon])) & (lex_position > 0)
+               & (negation_breaks[lex_before] == negation_breaks[np.maximum(last_negation, 0)]))
+    # Negationen nach einem Modifier werden dem Lexikon-Wort davor zugeordnet
+    modifier_negated = np.bincount(np.searchsorted(lex_position, word_position[negation_after_modifier], side="right") - 1,
+                                   minlength=len(lex_position)) > 0
+    group_negated = np.bincount(group, weights=negated | modifier_negated, minlength=groups) > 0
+
+    # Schritt 5 ("!"): jedes "!" nach einem Lexikon-Wort desselben Tweets verstärkt dessen Bewertung um den Faktor 1.25
+    exclamation = (words == "!").to_numpy() & (last_lexicon >= tweet_start)
+    boost = 1.25 ** np.bincount(group[np.searchsorted(lex_position, last_lexicon[exclamation])], minlength=groups)
+
+    # Schritt 6: Gewicht je Bewertung aus der Intensität des Modifiers, die Intensität eines negierten Modifiers wird
+    # umgekehrt ("not very good")
+    intensity = LEXICON_INTENSITY[lex_column] ** np.where(negated, -1.0, 1.0)
+    weight = np.where(follows_modifier, np.r_[1.0, intensity[:-1]], 1.0)[group_last] * boost
+    # wie beim PatternAnalyzer wird jede Bewertung auf [-1, 1] begrenzt, die Negation erst danach angewendet
+    values = np.clip(LEXICON_POLARITY[lex_column[group_last]] * weight, -1.0, 1.0) * np.where(group_negated, -0.5, 1.0)
+
+    # Schritt 7: Polarity = Summe der Bewertungen / Anzahl Bewertungen je Tweet
+    assessment_tweet = lex_tweet[group_last]
+    assessments = np.bincount(assessment_tweet, minlength=len(texts))
+    return np.bincount(assessment_tweet, weights=values, minlength=len(texts)) / np.maximum(assessments, 1)
+
+
+# verfügbare Backends der Bewertung, beide erwarten die mit normalize_tweets bereinigten Texte
+SENTIMENT_BACKENDS = {"textblob": cached_polarities, "lexicon": lexicon_polarities}
+SENTIMENT_BACKEND = "textblob"
+
+
+# Vergleich der Backends mit dem ungecachten TextBlob Ergebnis
+def compare_sentiment_backends(tweets):
+    texts = list(tweets)
+    t = time.perf_counter()
+    reference = np.array(polarity_batch(texts))
+    results = {"textblob": (reference, time.perf_counter() - t)}
+    t = time.perf_counter()
+    results["lexicon"] = (lexicon_polarities(texts), time.perf_counter() - t)
+    return pd.DataFrame({
+        name: {"tweets": len(texts), "seconds": seconds, "tweets_per_second": len(texts) / seconds if seconds else np.nan,
+               "sign_agreement": np.mean(np.sign(values) == np.sign(reference)) if texts else np.nan,
+               "mean_abs_diff": np.mean(np.abs(values - reference)) if texts else np.nan}
+        for name, (values, seconds) in results.items()}).T
+
+
+# Archiv der abgerufenen Tweets, unterteilt nach Tag (UTC) und Kryptowährung
+TWEET_ARCHIVE = "TweetArchive"
+ARCHIVE_SCHEMA = pa.schema([("id", pa.int64()), ("created_at", pa.timestamp("us", tz="UTC")), ("text", pa.string())])
+ARCHIVE_PARTITIONING = ds.partitioning(pa.schema([("day", pa.string()), ("crypto", pa.string())]), flavor="hive")
+
+
+# Umwandlung der Erstellzeit der Tweets (UTC) in die lokale Zeit ohne Zeitzone, wie datetime.now() in TwitterDF.csv und History.db
+def to_local_time(times):
+    return pd.to_datetime(times, utc=True).dt.tz_convert(tzlocal()).dt.tz_localize(None)
+
+
+def archive_partition_path(day, crypto, root=TWEET_ARCHIVE):
+    return os.path.join(root, f"day={day}", f"crypto={crypto}", "tweets.parquet")
+
+
+# Anhängen neuer Tweets an das Archiv, Rückgabe der Anzahl neu gespeicherter Tweets
+def archive_tweets(tweets_df, root=TWEET_ARCHIVE):
+    df = tweets_df[TWEET_COLUMNS].copy()
+    df["id"] = df["id"].astype("int64")
+    df["created_at"] = pd.to_datetime(df["created_at"], utc=True)
+    df["day"] = df["created_at"].dt.strftime("%Y-%m-%d")
+    written = 0
+    for (day, crypto), part in df.groupby(["day", "crypto"], sort=False):
+        path = archive_partition_path(day, crypto, root)
+        part = part.drop_duplicates("id")
+        tables = []
+        if os.path.exists(path):
+            existing = pq.ParquetFile(path).read()
+            part = part[~part["id"].isin(existing.column("id").to_numpy())]
+            tables.append(existing)
+        if part.empty:
+            continue
+        tables.append(pa.Table.from_pandas(part[ARCHIVE_SCHEMA.names], schema=ARCHIVE_SCHEMA, preserve_index=False))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Dateien mit "." am Anfang werden von ds.dataset ignoriert, eine nach einem Abbruch verbliebene Datei wird also nicht gelesen
+        tmp = os.path.join(os.path.dirname(path), ".tweets.parquet.tmp")
+        pq.write_table(pa.concat_tables(tables), tmp, compression="zstd")
+        os.replace(tmp, path)
+        written += len(part)
+    return written
+
+
+# blockweises Lesen des Archivs, start_day/end_day im Format "YYYY-MM-DD" (jeweils inklusive)
+def iter_tweet_archive(start_day=None, end_day=None, cryptos=None, columns=None, batch_size=100_000, root=TWEET_ARCHIVE):
+    if not os.path.exists(root):
+        return
+    dataset = ds.dataset(root, format="parquet", partitioning=ARCHIVE_PARTITIONING)
+    filters = []
+    if start_day is not None:
+        filters.append(ds.field("day") >= start_day)
+    if end_day is not None:
+        filters.append(ds.field("day") <= end_day)
+    if cryptos is not None:
+        filters.append(ds.field("crypto").isin(list(cryptos)))
+    condition = None
+    for expression in filters:
+        condition = expression if condition is None else condition & expression
+    # es werden nur die Dateien der passenden Tage und Kryptowährungen gelesen
+    for batch in dataset.to_batches(columns=columns, filter=condition, batch_size=batch_size):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+# Neubewertung des Archivs, Breite der Zeitfenster und Anzahl Tweets je gelesenem Block
+RESCORE_BUCKET = "30min"
+RESCORE_BATCH_SIZE = 50_000
+
+
+def rescore_archive(start_day=None, end_day=None, cryptos=None, bucket=RESCORE_BUCKET,
+                    batch_size=RESCORE_BATCH_SIZE, path="TwitterRescoredDF.csv", backend=None):
+    global SentimentPool
+    # TextBlob über den Prozess-Pool (ohne Cache) oder das vektorisierte Lexikon
+    score = lexicon_polarities if (backend or SENTIMENT_BACKEND) == "lexicon" else sentiment_polarities
+    t = time.perf_counter()
+    tweets = 0
+    counts = []
+    for chunk in iter_tweet_archive(start_day, end_day, cryptos, columns=["created_at", "text", "crypto"], batch_size=batch_size):
+        # Klasse je Tweet: 0 = negativ, 1 = neutral, 2 = positiv
+        classes = np.sign(score(normalize_tweets(chunk["text"]))).astype(np.int64) + 1
+        # Buckets in lokaler Zeit ohne Zeitzone, wie in der TwitterDF.csv
+        counts.append(pd.DataFrame({"time": to_local_time(chunk["created_at"]).dt.floor(bucket), "crypto": chunk["crypto"], "class": classes}).value_counts())
+        tweets += len(chunk)
+    if counts:
+        rows = pd.concat(counts).groupby(level=["time", "crypto", "class"]).sum().unstack("class", fill_value=0)
+        rows = rows.reindex(columns=[2, 0, 1], fill_value=0).set_axis(["pos", "neg", "neu"], axis=1).reset_index()
+        rows["count"] = rows[["pos", "neg", "neu"]].sum(axis=1)
+    else:
+        rows = pd.DataFrame(columns=TWITTER_COLUMNS)
+    rows[TWITTER_COLUMNS].to_csv(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+    seconds = time.perf_counter() - t
+    # Peak RSS der beendeten Prozesse des Pools ist erst nach deren Ende über RUSAGE_CHILDREN verfügbar
+    if SentimentPool is not None:
+        SentimentPool.shutdown(wait=True)
+        SentimentPool = None
+    stats = {"tweets": tweets, "seconds": seconds, "tweets_per_second": tweets / seconds,
+             "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+             "peak_rss_worker_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024}
+    return rows, stats